@@ -7,15 +7,85 @@ PERFORMANCE OPTIMIZATIONS:
 - Uses instagrapi best practices for session management (no slow validation checks)
 - Adds random delays between requests (1-3 seconds) to avoid rate limiting
 - All needed data including sponsor_tags is available in the feed response
+- Fetches comments and downloads media for several posts in parallel (I/O-bound)
 """
 
 from instagrapi import Client
 from instagrapi.exceptions import TwoFactorRequired
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse
 import getpass
 import os
+import requests
+import shutil
+import threading
+import time
+
+# Optional: stream-parse existing feed files instead of loading them whole
+try:
+    import ijson
+    try:
+        ijson = ijson.get_backend('yajl2_c')  # C-accelerated parser when available
+    except Exception:
+        pass
+except ImportError:
+    ijson = None
+
+# Optional: orjson parses and serializes JSON several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Instagram media_type codes -> names used in the JSON output
+MEDIA_TYPE_NAMES = {1: "photo", 2: "video", 8: "album"}
+
+# Media downloads are streamed to disk in chunks of this size, so memory use
+# per download stays flat regardless of file size
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Content-Type -> file extension for downloaded media
+MEDIA_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/heic": "heic",
+    "video/mp4": "mp4",
+}
+
+# Fetched comments keyed by "post_id:max_comments", persisted between runs so
+# re-processing overlapping feed windows doesn't re-fetch them within the TTL
+COMMENT_CACHE_FILE = Path(".comment_cache.json")
+COMMENT_CACHE_TTL = 3600
+_comment_cache = None  # Loaded on first use
+_comment_cache_lock = threading.Lock()
+
+# instagrapi keeps each response on the Client (last_json / last_public_json) and
+# reads it back, so overlapping API calls on one Client can swap results.
+# Every Instagram API call from the worker threads goes through this lock;
+# only the CDN media downloads run concurrently.
+_api_lock = threading.Lock()
+
+# Concurrent downloads per album - keeps us polite to Instagram's CDN
+MAX_ALBUM_DOWNLOADS = 4
+
+# Session used only for CDN media downloads. Unlike instagrapi's cl.public it
+# verifies TLS, never carries the Instagram sessionid cookie, and isn't touched
+# by instagrapi's own calls. configure_download_session() sizes its pool.
+_download_session = requests.Session()
+
+
+def configure_download_session(pool_size: int) -> None:
+    """Size the download session's keep-alive pool for the number of concurrent downloads"""
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    _download_session.mount("https://", adapter)
+    _download_session.mount("http://", adapter)
 
 
 def login_user(username: str, password: str = None, session_file: str = "session.json") -> Client:
@@ -72,6 +142,124 @@ def login_user(username: str, password: str = None, session_file: str = "session
     return cl
 
 
+class _DictView:
+    """Read-only view of a raw feed item dict, shaped like instagrapi's Media
+
+    Lets extract_post_data() read raw API dicts through the same attribute names
+    it uses for Media objects, so the extraction logic only exists once. Each
+    attribute is an explicit property (no __getattr__ fallback), so a malformed
+    item raises instead of silently reading as None.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    @property
+    def id(self):
+        return self._data.get('id') or self._data.get('pk')
+
+    @property
+    def code(self):
+        return self._data.get('code')
+
+    @property
+    def user(self):
+        user = self._data.get('user', {})
+        if not isinstance(user, dict):
+            # No pk at all (rather than pk=None), so user_id stays None as before
+            return SimpleNamespace(username=str(user), full_name=None, is_verified=False,
+                                   profile_pic_url=None, biography=None)
+        return SimpleNamespace(
+            username=user.get('username'),
+            pk=user.get('pk'),
+            full_name=user.get('full_name'),
+            is_verified=user.get('is_verified'),
+            profile_pic_url=user.get('profile_pic_url'),
+            biography=user.get('biography'),
+        )
+
+    @property
+    def caption_text(self):
+        caption = self._data.get('caption')
+        return caption.get('text') if isinstance(caption, dict) else (self._data.get('caption_text') or caption)
+
+    @property
+    def like_count(self):
+        return self._data.get('like_count', 0)
+
+    @property
+    def comment_count(self):
+        return self._data.get('comment_count', 0)
+
+    @property
+    def taken_at(self):
+        return self._data.get('taken_at')
+
+    @property
+    def media_type(self):
+        return self._data.get('media_type')
+
+    @property
+    def thumbnail_url(self):
+        candidates = self._data.get('image_versions2', {}).get('candidates', [])
+        return candidates[0].get('url') if candidates else None
+
+    @property
+    def video_url(self):
+        video_versions = self._data.get('video_versions', [])
+        return video_versions[0].get('url') if video_versions else None
+
+    @property
+    def resources(self):
+        return self._data.get('carousel_media') or self._data.get('resources')
+
+    @property
+    def location(self):
+        location = self._data.get('location')
+        return SimpleNamespace(name=location.get('name')) if location and isinstance(location, dict) else None
+
+    @property
+    def is_paid_partnership(self):
+        return self._data.get('is_paid_partnership', False)
+
+    @property
+    def sponsor_tags(self):
+        return []  # Raw sponsor tags aren't parsed into users; is_paid_partnership covers them
+
+    @property
+    def filter_type(self):
+        return self._data.get('filter_type')
+
+    @property
+    def has_audio(self):
+        return self._data.get('has_audio')
+
+
+def _as_media(media):
+    """Return media itself if it's a Media object, otherwise a Media-shaped _DictView"""
+    if hasattr(media, 'id') and hasattr(media, 'user'):
+        return media
+    post_dict = media if isinstance(media, dict) else (media.dict() if hasattr(media, 'dict') else media.__dict__)
+    return _DictView(post_dict)
+
+
+def _cheap_post_id(media) -> str:
+    """Read only the post ID (same value as extract_post_data()['id'])"""
+    return str(_as_media(media).id)
+
+
+def _cheap_is_sponsored(media) -> bool:
+    """Read only the sponsor fields (same value as extract_post_data()['is_sponsored'])"""
+    source = _as_media(media)
+    return bool(getattr(source, 'is_paid_partnership', False) or getattr(source, 'sponsor_tags', None))
+
+
+def _cheap_username(media) -> str:
+    """Read only the poster's username"""
+    return _as_media(media).user.username
+
+
 def extract_post_data(cl: Client, media) -> dict:
     """Extract all available data from a Media object (already from feed)"""
     
@@ -79,89 +267,49 @@ def extract_post_data(cl: Client, media) -> dict:
     # No need to call media_info() which makes an extra API call per post!
     
     try:
-        # Check if it's a proper Media object or a dict
-        is_media_object = hasattr(media, 'id') and hasattr(media, 'user')
-        
-        if is_media_object:
-            # Extract from the Media object directly
-            post_id = media.id
-            code = media.code
-            username = media.user.username
-            user_id = str(media.user.pk)
-            user_full_name = media.user.full_name
-            is_verified = media.user.is_verified if hasattr(media.user, 'is_verified') else False
-            user_avatar_url = media.user.profile_pic_url if hasattr(media.user, 'profile_pic_url') else None
-            user_bio = media.user.biography if hasattr(media.user, 'biography') else None
-            caption = media.caption_text
-            likes = media.like_count
-            comments_count = media.comment_count
-            timestamp = int(media.taken_at.timestamp()) if media.taken_at else None
-            timestamp_human = media.taken_at.strftime("%Y-%m-%d %H:%M:%S") if media.taken_at else None
-            media_type = media.media_type
-            media_type_name = {1: "photo", 2: "video", 8: "album"}.get(media_type, str(media_type))
-            thumbnail_url = media.thumbnail_url
-            video_url = media.video_url if hasattr(media, 'video_url') else None
-            carousel_count = len(media.resources) if hasattr(media, 'resources') and media.resources else 0
-            location_name = media.location.name if hasattr(media, 'location') and media.location else None
-
-            # SPONSOR FIELDS - available in feed Media objects
-            is_paid_partnership = media.is_paid_partnership if hasattr(media, 'is_paid_partnership') else False
-            sponsor_tags = []
-            if hasattr(media, 'sponsor_tags') and media.sponsor_tags:
-                sponsor_tags = [{"username": s.username, "user_id": str(s.pk)} for s in media.sponsor_tags]
-
-            # Additional metadata
-            filter_type = media.filter_type if hasattr(media, 'filter_type') else None
-            has_audio = media.has_audio if hasattr(media, 'has_audio') else None
+        # Anything that isn't a proper Media object is read through a Media-shaped view
+        source = _as_media(media)
+
+        post_id = source.id
+        code = source.code
+        user = source.user
+        username = user.username
+        user_id = str(user.pk) if hasattr(user, 'pk') else None
+        user_full_name = user.full_name
+        is_verified = getattr(user, 'is_verified', False)
+        user_avatar_url = getattr(user, 'profile_pic_url', None)
+        user_bio = getattr(user, 'biography', None)
+        caption = source.caption_text
+        likes = source.like_count
+        comments_count = source.comment_count
+
+        taken_at = source.taken_at
+        if not taken_at:
+            timestamp = timestamp_human = None
+        elif isinstance(taken_at, int):
+            # Raw feed items already carry a Unix timestamp - only format it
+            timestamp = taken_at
+            timestamp_human = datetime.fromtimestamp(taken_at).strftime("%Y-%m-%d %H:%M:%S")
         else:
-            # Fallback to dict extraction
-            post_dict = media if isinstance(media, dict) else (media.dict() if hasattr(media, 'dict') else media.__dict__)
-
-            post_id = post_dict.get('id') or post_dict.get('pk')
-            code = post_dict.get('code')
-            user_data = post_dict.get('user', {})
-            username = user_data.get('username') if isinstance(user_data, dict) else str(user_data)
-            user_id = str(user_data.get('pk')) if isinstance(user_data, dict) else None
-            user_full_name = user_data.get('full_name') if isinstance(user_data, dict) else None
-            is_verified = user_data.get('is_verified') if isinstance(user_data, dict) else False
-            user_avatar_url = user_data.get('profile_pic_url') if isinstance(user_data, dict) else None
-            user_bio = user_data.get('biography') if isinstance(user_data, dict) else None
-
-            caption_data = post_dict.get('caption')
-            caption = caption_data.get('text') if isinstance(caption_data, dict) else (post_dict.get('caption_text') or caption_data)
-
-            likes = post_dict.get('like_count', 0)
-            comments_count = post_dict.get('comment_count', 0)
-
-            timestamp = post_dict.get('taken_at')
-            if timestamp:
-                if isinstance(timestamp, int):
-                    dt = datetime.fromtimestamp(timestamp)
-                else:
-                    dt = timestamp
-                timestamp = int(dt.timestamp()) if hasattr(dt, 'timestamp') else timestamp
-                timestamp_human = dt.strftime("%Y-%m-%d %H:%M:%S") if hasattr(dt, 'strftime') else None
-            else:
-                timestamp_human = None
-
-            media_type = post_dict.get('media_type')
-            media_type_name = {1: "photo", 2: "video", 8: "album"}.get(media_type, str(media_type))
-
-            image_versions = post_dict.get('image_versions2', {})
-            candidates = image_versions.get('candidates', [])
-            thumbnail_url = candidates[0].get('url') if candidates else None
-
-            video_versions = post_dict.get('video_versions', [])
-            video_url = video_versions[0].get('url') if video_versions else None
-
-            carousel_count = len(post_dict.get('carousel_media', [])) or len(post_dict.get('resources', []))
-            location = post_dict.get('location')
-            location_name = location.get('name') if location and isinstance(location, dict) else None
-
-            is_paid_partnership = post_dict.get('is_paid_partnership', False)
-            sponsor_tags = []
-            filter_type = post_dict.get('filter_type')
-            has_audio = post_dict.get('has_audio')
+            timestamp = int(taken_at.timestamp()) if hasattr(taken_at, 'timestamp') else taken_at
+            timestamp_human = taken_at.strftime("%Y-%m-%d %H:%M:%S") if hasattr(taken_at, 'strftime') else None
+
+        media_type = source.media_type
+        media_type_name = MEDIA_TYPE_NAMES.get(media_type) or str(media_type)
+        thumbnail_url = source.thumbnail_url
+        video_url = getattr(source, 'video_url', None)
+        resources = getattr(source, 'resources', None)
+        carousel_count = len(resources) if resources else 0
+        location = getattr(source, 'location', None)
+        location_name = location.name if location else None
+
+        # SPONSOR FIELDS - available in feed Media objects
+        is_paid_partnership = getattr(source, 'is_paid_partnership', False)
+        sponsor_tags = [{"username": s.username, "user_id": str(s.pk)} for s in getattr(source, 'sponsor_tags', None) or []]
+
+        # Additional metadata
+        filter_type = getattr(source, 'filter_type', None)
+        has_audio = getattr(source, 'has_audio', None)
 
     except Exception as e:
         print(f"  ⚠ Warning: Error extracting post data: {e}")
@@ -201,6 +349,13 @@ def extract_post_data(cl: Client, media) -> dict:
     }
 
 
+def fetch_timeline_page(cl: Client, max_id: str = None) -> dict:
+    """Fetch one page of the timeline feed (the first page when max_id is None)"""
+    if max_id:
+        return cl.get_timeline_feed(reason="pagination", max_id=max_id)
+    return cl.get_timeline_feed()  # instagrapi's default reason for the first page
+
+
 def get_feed_posts(cl: Client, amount: int = 20) -> list:
     """Get feed posts with full metadata (with pagination)"""
     print(f"\nFetching {amount} posts from your feed...")
@@ -208,13 +363,15 @@ def get_feed_posts(cl: Client, amount: int = 20) -> list:
     all_posts = []
     max_attempts = 5  # Maximum pagination attempts
     attempt = 0
+    max_id = None  # Pagination cursor - None fetches the top of the feed
+    seen_ids = set()  # IDs already in all_posts, maintained as pages are added
 
     try:
         while len(all_posts) < amount and attempt < max_attempts:
             attempt += 1
             print(f"  Fetching batch {attempt}... (have {len(all_posts)} posts so far)")
 
-            feed_result = cl.get_timeline_feed()
+            feed_result = fetch_timeline_page(cl, max_id)
 
             if isinstance(feed_result, dict):
                 if 'feed_items' in feed_result:
@@ -231,8 +388,7 @@ def get_feed_posts(cl: Client, amount: int = 20) -> list:
                 break
 
             # Add new posts (avoid duplicates)
-            existing_ids = {p.get('id') or p.get('pk') for p in all_posts}
-            new_posts = [p for p in posts if (p.get('id') or p.get('pk')) not in existing_ids]
+            new_posts = [p for p in posts if (p.get('id') or p.get('pk')) not in seen_ids]
 
             if not new_posts:
                 print(f"  No new posts found, stopping")
@@ -244,21 +400,27 @@ def get_feed_posts(cl: Client, amount: int = 20) -> list:
                     # Try to extract basic info for display
                     username = post.user.username if hasattr(post, 'user') else post.get('user', {}).get('username', 'unknown')
                     media_type = post.media_type if hasattr(post, 'media_type') else post.get('media_type', 0)
-                    media_name = {1: "photo", 2: "video", 8: "album"}.get(media_type, str(media_type))
+                    media_name = MEDIA_TYPE_NAMES.get(media_type) or str(media_type)
                     caption = (post.caption_text if hasattr(post, 'caption_text') else post.get('caption_text', ''))[:50]
                     print(f"    • @{username} - {media_name} - {caption}...")
                 except Exception as e:
                     print(f"    • Post fetched (details hidden)")
 
             all_posts.extend(new_posts)
+            seen_ids.update(p.get('id') or p.get('pk') for p in new_posts)
             print(f"  ✓ Got {len(new_posts)} new posts")
 
             # If we have enough, stop
             if len(all_posts) >= amount:
                 break
 
+            # Advance the cursor so the next call returns the next page, not the same one
+            max_id = feed_result.get('next_max_id') if isinstance(feed_result, dict) else None
+            if not max_id:
+                print(f"  No more pages available")
+                break
+
             # Small delay to be nice to Instagram's API
-            import time
             time.sleep(1)
 
         # Return only the requested amount
@@ -273,11 +435,43 @@ def get_feed_posts(cl: Client, amount: int = 20) -> list:
         return all_posts  # Return what we got so far  # Return what we got so far
 
 
+def _get_comment_cache() -> dict:
+    """Return the comment cache, loading it from disk on first use (call with the lock held)"""
+    global _comment_cache
+    if _comment_cache is None:
+        try:
+            _comment_cache = load_json_file(COMMENT_CACHE_FILE) if COMMENT_CACHE_FILE.exists() else {}
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not read comment cache: {e}")
+            _comment_cache = {}
+    return _comment_cache
+
+
+def save_comment_cache() -> None:
+    """Write the comment cache back to disk, dropping expired entries"""
+    with _comment_cache_lock:
+        if _comment_cache is None:
+            return
+        now = time.time()
+        fresh = {key: entry for key, entry in _comment_cache.items() if now - entry[0] < COMMENT_CACHE_TTL}
+        try:
+            save_json_file(fresh, COMMENT_CACHE_FILE)
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not save comment cache: {e}")
+
+
 def get_post_comments(cl: Client, post_id: str, max_comments: int = 50) -> list:
-    """Fetch comments for a post"""
+    """Fetch comments for a post (served from the comment cache when fresh)"""
+    cache_key = f"{post_id}:{max_comments}"
+    with _comment_cache_lock:
+        cached = _get_comment_cache().get(cache_key)
+    if cached and time.time() - cached[0] < COMMENT_CACHE_TTL:
+        return cached[1]
+
     try:
-        comments = cl.media_comments(post_id, amount=max_comments)
-        return [
+        with _api_lock:
+            comments = cl.media_comments(post_id, amount=max_comments)
+        comments = [
             {
                 "user": c.user.username,
                 "text": c.text,
@@ -290,9 +484,44 @@ def get_post_comments(cl: Client, post_id: str, max_comments: int = 50) -> list:
         print(f"  Warning: Could not fetch comments: {e}")
         return []
 
+    with _comment_cache_lock:
+        _get_comment_cache()[cache_key] = [time.time(), comments]
+    return comments
+
+
+def download_stream(session, url: str, filepath: Path, default_ext: str, timeout: int = 30) -> Path:
+    """Stream url to filepath (extension picked from Content-Type) and return the saved path"""
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        ext = MEDIA_EXTENSIONS.get(content_type) or Path(urlparse(url).path).suffix.lstrip('.') or default_ext
+        path = filepath.with_name(f"{filepath.name}.{ext}")
+
+        # Write to a .part file and only rename it into place once the transfer is
+        # complete, so a failed or truncated download never leaves a file behind
+        part_path = path.with_name(path.name + ".part")
+        try:
+            response.raw.decode_content = True
+            with open(part_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+                written = f.tell()
+
+            # Catch truncated transfers (only comparable when the body isn't compressed)
+            expected = response.headers.get('Content-Length')
+            if expected and not response.headers.get('Content-Encoding') and int(expected) != written:
+                raise IOError(f"incomplete download ({written}/{expected} bytes)")
+
+            os.replace(part_path, path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+    return path
+
 
 def download_media(cl: Client, post_data: dict, download_dir: str = "downloads", max_retries: int = 2) -> dict:
-    """Download media files for a post with retry logic"""
+    """Download media files for a post with retry logic (album items are downloaded concurrently)"""
     Path(download_dir).mkdir(exist_ok=True)
 
     post_id = post_data['id']
@@ -302,77 +531,64 @@ def download_media(cl: Client, post_data: dict, download_dir: str = "downloads",
     downloaded_files = []
 
     def download_with_retry(download_func, *args, **kwargs):
-        """Helper to retry downloads"""
+        """Helper to retry downloads, returning the path the download function saved to"""
         for attempt in range(max_retries):
             try:
-                download_func(*args, **kwargs)
-                return True
+                return download_func(*args, **kwargs)
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"  ⚠ Retry {attempt + 1}/{max_retries}...")
-                    import time
                     time.sleep(2)  # Wait 2 seconds before retry
                 else:
                     raise e
-        return False
+        return None
+
+    def download_one(job):
+        """Download a single (default_ext, url, filename) job, returning the saved path or None"""
+        default_ext, url, filename = job
+        filepath = Path(download_dir) / filename
+        try:
+            # Streamed over the dedicated download session (TLS verified, no Instagram
+            # cookies); the returned path includes the extension, so no directory scan
+            saved_path = download_with_retry(download_stream, _download_session, url, filepath, default_ext, cl.request_timeout)
+            if saved_path:
+                print(f"  ✓ Downloaded: {saved_path.name}")
+                return str(saved_path)
+        except Exception as e:
+            print(f"  ✗ Error downloading {filename}: {e}")
+        return None
 
     try:
+        # Collect every (default_ext, url, filename) for the post up front.
+        # The extension is added once the response's Content-Type is known.
+        jobs = []
         if media_type == "photo":
-            # Download photo (instagrapi adds extension automatically, so don't include it)
-            print(f"  → Downloading photo...")
-            filename = f"{username}_{post_id}"
-            filepath = Path(download_dir) / filename
-            if download_with_retry(cl.photo_download_by_url, post_data['thumbnail_url'], filepath):
-                # Find the actual file created (might be .jpg or .png)
-                actual_files = list(Path(download_dir).glob(f"{username}_{post_id}.*"))
-                if actual_files:
-                    downloaded_files.append(str(actual_files[0]))
-                    print(f"  ✓ Downloaded photo: {actual_files[0].name}")
+            jobs.append(("jpg", post_data['thumbnail_url'], f"{username}_{post_id}"))
 
         elif media_type == "video":
-            # Download video (instagrapi adds .mp4 automatically, so don't include it)
-            print(f"  → Downloading video...")
-            filename = f"{username}_{post_id}"
-            filepath = Path(download_dir) / filename
-            if download_with_retry(cl.video_download_by_url, post_data['video_url'], filepath):
-                # Find the actual file created
-                actual_files = list(Path(download_dir).glob(f"{username}_{post_id}.*"))
-                if actual_files:
-                    downloaded_files.append(str(actual_files[0]))
-                    print(f"  ✓ Downloaded video: {actual_files[0].name}")
+            jobs.append(("mp4", post_data['video_url'], f"{username}_{post_id}"))
 
         elif media_type == "album":
             # Download album - need to get full media info
             media_pk = int(post_id.split('_')[0])
-            print(f"  → Fetching album details...")
-            media_info = cl.media_info(media_pk)
+            print(f"  → Fetching album details for @{username}...")
+            with _api_lock:
+                media_info = cl.media_info(media_pk)
 
-            if hasattr(media_info, 'resources'):
-                total_items = len(media_info.resources)
-                print(f"  → Downloading {total_items} items from album...")
-                
-                for idx, resource in enumerate(media_info.resources, 1):
-                    item_type = "photo" if resource.media_type == 1 else "video"
-                    print(f"    [{idx}/{total_items}] Downloading {item_type}...", end=" ")
-                    
-                    if resource.media_type == 1:  # Photo
-                        filename = f"{username}_{post_id}_{idx}"  # No extension!
-                        filepath = Path(download_dir) / filename
-                        if download_with_retry(cl.photo_download_by_url, resource.thumbnail_url, filepath):
-                            actual_files = list(Path(download_dir).glob(f"{username}_{post_id}_{idx}.*"))
-                            if actual_files:
-                                downloaded_files.append(str(actual_files[0]))
-                                print(f"✓ {actual_files[0].name}")
-                    elif resource.media_type == 2:  # Video
-                        filename = f"{username}_{post_id}_{idx}"  # No extension!
-                        filepath = Path(download_dir) / filename
-                        if download_with_retry(cl.video_download_by_url, resource.video_url, filepath):
-                            actual_files = list(Path(download_dir).glob(f"{username}_{post_id}_{idx}.*"))
-                            if actual_files:
-                                downloaded_files.append(str(actual_files[0]))
-                                print(f"✓ {actual_files[0].name}")
-                
-                print(f"  ✓ Downloaded album: {len(downloaded_files)}/{total_items} files")
+            for idx, resource in enumerate(getattr(media_info, 'resources', None) or [], 1):
+                if resource.media_type == 1:  # Photo
+                    jobs.append(("jpg", resource.thumbnail_url, f"{username}_{post_id}_{idx}"))
+                elif resource.media_type == 2:  # Video
+                    jobs.append(("mp4", resource.video_url, f"{username}_{post_id}_{idx}"))
+
+        if jobs:
+            print(f"  → Downloading {len(jobs)} item(s) from @{username}'s {media_type}...")
+            # Overlap the downloads (bounded) so an album isn't fetched strictly one item at a time
+            with ThreadPoolExecutor(max_workers=min(len(jobs), MAX_ALBUM_DOWNLOADS)) as executor:
+                downloaded_files = [path for path in executor.map(download_one, jobs) if path]
+
+            if media_type == "album":
+                print(f"  ✓ Downloaded album: {len(downloaded_files)}/{len(jobs)} files")
 
     except Exception as e:
         print(f"  ✗ Error downloading media: {e}")
@@ -381,6 +597,17 @@ def download_media(cl: Client, post_data: dict, download_dir: str = "downloads",
     return {"downloaded_files": downloaded_files}
 
 
+def fetch_post_extras(cl: Client, post_data: dict, fetch_comments: bool, download_media_files: bool) -> dict:
+    """Fetch comments and download media for a single post (runs in a worker thread)"""
+    if fetch_comments and post_data['comments_count'] > 0:
+        post_data['comments'] = get_post_comments(cl, post_data['id'])
+
+    if download_media_files:
+        post_data.update(download_media(cl, post_data))
+
+    return post_data
+
+
 def display_post_info(post_data: dict) -> None:
     """Display formatted post information"""
     print(f"\n{'='*80}")
@@ -412,34 +639,83 @@ def display_post_info(post_data: dict) -> None:
         print(f"Caption: {caption}")
 
 
-def load_existing_posts(directory: str = ".") -> dict:
-    """Load all existing post IDs from master feed and backup files"""
-    existing_posts = {}
+def load_json_file(json_file) -> object:
+    """Load a whole JSON file (orjson when available)"""
+    with open(json_file, 'rb') as f:
+        return orjson.loads(f.read()) if orjson else json.load(f)
+
+
+def save_json_file(data, json_file) -> None:
+    """Save data as indented UTF-8 JSON (orjson when available)
+
+    Lists are written one element at a time, so a large feed is never held as a
+    second, fully serialized copy in memory. The file is fsynced once at the end.
+    """
+    if orjson:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        with open(json_file, 'wb') as f:
+            if isinstance(data, list) and data:
+                # Same layout as json.dump(indent=2): each element indented one level
+                for i, item in enumerate(data):
+                    f.write(b",\n  " if i else b"[\n  ")
+                    f.write(orjson.dumps(item, option=option).replace(b"\n", b"\n  "))
+                f.write(b"\n]")
+            else:
+                f.write(orjson.dumps(data, option=option))
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        # json.dump already streams its output in chunks
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def iter_feed_posts(json_file: Path):
+    """Yield posts one at a time from a feed JSON file (array or {"posts": [...]} format)"""
+    if ijson is None:
+        data = load_json_file(json_file)
+        yield from (data if isinstance(data, list) else data.get('posts', []))
+        return
+
+    with open(json_file, 'rb') as f:
+        # Peek at the first non-whitespace byte to pick the array or object layout
+        head = f.read(64).lstrip()
+        f.seek(0)
+        prefix = 'posts.item' if head.startswith(b'{') else 'item'
+        yield from ijson.items(f, prefix)
+
+
+def _parse_one_feed_file(json_file: Path) -> tuple:
+    """Return (post_ids, error) for one feed file - top-level so a process pool can pickle it"""
+    try:
+        return {post['id'] for post in iter_feed_posts(json_file) if post.get('id')}, None
+    except Exception as e:
+        return set(), str(e)
+
+
+def load_existing_posts(directory: str = ".") -> tuple:
+    """Load all existing post IDs from master feed and backup files
+
+    Returns (existing_ids, feed_files): the set of saved post IDs for fast duplicate
+    checks, and the files they came from for describe_existing_post().
+    """
+    existing_ids = set()
+    feed_files = []
 
     # Check master feed first
     master_feed = Path(directory) / "feed_master.json"
 
     if master_feed.exists():
         print(f"\n🔍 Checking master feed for duplicates...")
-        try:
-            with open(master_feed, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Handle both array and object formats
-            posts = data if isinstance(data, list) else data.get('posts', [])
-
-            for post in posts:
-                post_id = post.get('id')
-                if post_id:
-                    existing_posts[post_id] = {
-                        'file': 'feed_master.json',
-                        'user': post.get('user'),
-                        'timestamp': post.get('timestamp_human')
-                    }
-
-            print(f"  ✓ Found {len(existing_posts)} existing posts in master feed")
-        except Exception as e:
-            print(f"  ⚠ Warning: Could not read master feed: {e}")
+        post_ids, error = _parse_one_feed_file(master_feed)
+        if error:
+            print(f"  ⚠ Warning: Could not read master feed: {error}")
+        else:
+            existing_ids = post_ids
+            feed_files.append(master_feed)
+            print(f"  ✓ Found {len(existing_ids)} existing posts in master feed")
     else:
         # Fallback: check old feed_enhanced_*.json and feed_backup_*.json files
         json_files = list(Path(directory).glob("feed_enhanced_*.json")) + list(Path(directory).glob("feed_backup_*.json"))
@@ -447,30 +723,49 @@ def load_existing_posts(directory: str = ".") -> dict:
         if json_files:
             print(f"\n🔍 Checking {len(json_files)} existing feed file(s) for duplicates...")
 
-            for json_file in json_files:
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-
-                    # Handle both array and object formats
-                    posts = data if isinstance(data, list) else data.get('posts', [])
-
-                    for post in posts:
-                        post_id = post.get('id')
-                        if post_id:
-                            existing_posts[post_id] = {
-                                'file': json_file.name,
-                                'user': post.get('user'),
-                                'timestamp': post.get('timestamp_human')
-                            }
-                except Exception as e:
-                    print(f"  ⚠ Warning: Could not read {json_file.name}: {e}")
+            # JSON parsing is CPU-bound, so spread several files across processes
+            if len(json_files) > 1:
+                # Each worker re-imports this module under spawn, so don't start more than needed
+                with ProcessPoolExecutor(max_workers=min(len(json_files), os.cpu_count() or 1)) as executor:
+                    results = list(executor.map(_parse_one_feed_file, json_files))
+            else:
+                results = [_parse_one_feed_file(json_files[0])]
+
+            for json_file, (post_ids, error) in zip(json_files, results):
+                if error:
+                    print(f"  ⚠ Warning: Could not read {json_file.name}: {error}")
                     continue
+                feed_files.append(json_file)
+
+            # Merge every file's ID set in one C-level union
+            existing_ids = existing_ids.union(*(post_ids for post_ids, _ in results))
+            if existing_ids:
+                print(f"  ✓ Found {len(existing_ids)} existing posts across all files")
 
-            if existing_posts:
-                print(f"  ✓ Found {len(existing_posts)} existing posts across all files")
+    return existing_ids, feed_files
 
-    return existing_posts
+
+def describe_existing_post(post_id: str, feed_files: list, cache: dict) -> tuple:
+    """Return (file, user, timestamp) for an already-saved post
+
+    Metadata is only needed for the duplicate message, so each feed file is read
+    lazily the first time a duplicate is looked up and kept in cache.
+    """
+    for json_file in feed_files:
+        if json_file not in cache:
+            try:
+                cache[json_file] = {
+                    post['id']: (post.get('user'), post.get('timestamp_human'))
+                    for post in iter_feed_posts(json_file) if post.get('id')
+                }
+            except Exception:
+                cache[json_file] = {}
+
+        if post_id in cache[json_file]:
+            user, timestamp = cache[json_file][post_id]
+            return json_file.name, user, timestamp
+
+    return None, None, None
 
 
 def main():
@@ -516,9 +811,16 @@ def main():
     sort_chronological = input("Sort chronologically (newest first)? (y/N): ").strip().lower() == 'y'
     fetch_comments = input("Fetch comments? (y/N): ").strip().lower() == 'y'
     download_media_files = input("Download media files? (y/N): ").strip().lower() == 'y'
+    workers = 5
+    if fetch_comments or download_media_files:
+        workers = max(1, int(input("Parallel workers for comments/downloads? (default: 5): ").strip() or "5"))
+    if download_media_files:
+        # Each worker can run up to MAX_ALBUM_DOWNLOADS downloads at once
+        configure_download_session(workers * MAX_ALBUM_DOWNLOADS)
 
     # Load existing posts for duplicate detection
-    existing_posts = load_existing_posts() if skip_duplicates else {}
+    existing_ids, feed_files = load_existing_posts() if skip_duplicates else (set(), [])
+    existing_info = {}  # Filled lazily by describe_existing_post()
 
     # Fetch posts
     posts = get_feed_posts(cl, amount)
@@ -539,40 +841,60 @@ def main():
     for i, post in enumerate(posts, 1):
         print(f"\n[{i}/{len(posts)}] Processing...", end=" ")
 
-        # Extract data with proper Media object (includes sponsor_tags!)
-        post_data = extract_post_data(cl, post)
+        # Filter on the cheap fields first so skipped posts are never fully extracted
+        post_id = _cheap_post_id(post)
 
         # Skip duplicates if requested
-        if skip_duplicates and post_data['id'] in existing_posts:
-            existing_info = existing_posts[post_data['id']]
-            print(f"⏭ Skipping duplicate (already in {existing_info['file']})")
-            print(f"   @{existing_info['user']} - {existing_info['timestamp']}")
+        if skip_duplicates and post_id in existing_ids:
+            existing_file, existing_user, existing_timestamp = describe_existing_post(post_id, feed_files, existing_info)
+            print(f"⏭ Skipping duplicate (already in {existing_file})")
+            print(f"   @{existing_user} - {existing_timestamp}")
             skipped_duplicates += 1
             continue
 
         # Skip sponsored posts if requested
-        if skip_sponsored and post_data['is_sponsored']:
-            print(f"⏭ Skipping sponsored post from @{post_data['user']}")
+        if skip_sponsored and _cheap_is_sponsored(post):
+            print(f"⏭ Skipping sponsored post from @{_cheap_username(post)}")
             skipped_sponsored += 1
             continue
 
+        # Extract data with proper Media object (includes sponsor_tags!)
+        post_data = extract_post_data(cl, post)
+
         print("✓")
         display_post_info(post_data)
+        all_posts_data.append(post_data)
 
-        # Get comments if requested
-        if fetch_comments and post_data['comments_count'] > 0:
-            print(f"\n  Fetching comments...")
-            comments = get_post_comments(cl, post_data['id'])
-            post_data['comments'] = comments
-            print(f"  ✓ Fetched {len(comments)} comments")
+    # Comments and downloads are network-bound, so overlap them across posts.
+    # Instagram API calls on the shared Client are serialized by _api_lock (one
+    # request and its delay_range at a time); the CDN downloads run in parallel.
+    if all_posts_data and (fetch_comments or download_media_files):
+        print("\n" + "="*80)
+        print(f"FETCHING COMMENTS / MEDIA ({workers} workers)".center(80))
+        print("="*80)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(fetch_post_extras, cl, post_data, fetch_comments, download_media_files): post_data
+                for post_data in all_posts_data
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                post_data = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"  ✗ Error processing @{post_data['user']}: {e}")
+                    continue
 
-        # Download media if requested
-        if download_media_files:
-            print(f"\n  Downloading media...")
-            download_info = download_media(cl, post_data)
-            post_data.update(download_info)
+                details = []
+                if 'comments' in post_data:
+                    details.append(f"{len(post_data['comments'])} comments")
+                if 'downloaded_files' in post_data:
+                    details.append(f"{len(post_data['downloaded_files'])} files")
+                print(f"[{done}/{len(all_posts_data)}] ✓ @{post_data['user']}" + (f" - {', '.join(details)}" if details else ""))
 
-        all_posts_data.append(post_data)
+    if fetch_comments:
+        save_comment_cache()
 
     # Determine master feed filename
     master_feed = "feed_master.json"
@@ -581,8 +903,7 @@ def main():
     if Path(master_feed).exists():
         print(f"\n📚 Loading existing master feed: {master_feed}")
         try:
-            with open(master_feed, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
+            existing_data = load_json_file(master_feed)
 
             # Handle both array and object formats
             existing_posts = existing_data if isinstance(existing_data, list) else existing_data.get('posts', [])
@@ -616,8 +937,7 @@ def main():
         combined_posts.sort(key=lambda p: p['timestamp'] or 0, reverse=True)
 
     # Save master feed
-    with open(master_feed, 'w', encoding='utf-8') as f:
-        json.dump(combined_posts, f, indent=2, ensure_ascii=False)
+    save_json_file(combined_posts, master_feed)
 
     print(f"\n✓ Master feed saved to {master_feed}")
 
@@ -627,8 +947,9 @@ def main():
     suffix += "_no_ads" if skip_sponsored else ""
     backup_filename = f"feed_backup_{timestamp}{suffix}.json"
 
-    with open(backup_filename, 'w', encoding='utf-8') as f:
-        json.dump(combined_posts, f, indent=2, ensure_ascii=False)
+    # The backup has the same contents as the master feed, so copy the file
+    # (kernel-side sendfile on Linux) instead of serializing every post again
+    shutil.copyfile(master_feed, backup_filename)
 
     print(f"✓ Backup saved to {backup_filename}")
 
@@ -643,17 +964,26 @@ def main():
         print(f"Duplicates skipped: {skipped_duplicates} ⏭")
     if skipped_sponsored > 0:
         print(f"Sponsored skipped: {skipped_sponsored} ⏭")
-    print(f"\nPhotos: {sum(1 for p in all_posts_data if p['media_type_name'] == 'photo')}")
-    print(f"Videos: {sum(1 for p in all_posts_data if p['media_type_name'] == 'video')}")
-    print(f"Albums: {sum(1 for p in all_posts_data if p['media_type_name'] == 'album')}")
-    sponsored_count = sum(1 for p in all_posts_data if p.get('is_sponsored', False))
+
+    # Tally everything in a single pass over the new posts
+    photos = videos = albums = sponsored_count = total_comments = total_downloads = 0
+    for p in all_posts_data:
+        media_type_name = p['media_type_name']
+        photos += media_type_name == 'photo'
+        videos += media_type_name == 'video'
+        albums += media_type_name == 'album'
+        sponsored_count += bool(p.get('is_sponsored', False))
+        total_comments += len(p.get('comments', ()))
+        total_downloads += len(p.get('downloaded_files', ()))
+
+    print(f"\nPhotos: {photos}")
+    print(f"Videos: {videos}")
+    print(f"Albums: {albums}")
     if sponsored_count > 0:
         print(f"Sponsored posts included: {sponsored_count}")
     if fetch_comments:
-        total_comments = sum(len(p.get('comments', [])) for p in all_posts_data)
         print(f"Comments fetched: {total_comments}")
     if download_media_files:
-        total_downloads = sum(len(p.get('downloaded_files', [])) for p in all_posts_data)
         print(f"Files downloaded: {total_downloads}")
 
     print("\n✓ Done!")